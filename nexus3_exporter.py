@@ -4,8 +4,55 @@ import json
 import time
 import sys
 import argparse
+import atexit
+import getpass
 import os
+import re
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
+from urllib.parse import quote, urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # Optional, noticeably faster on large Nexus pages
+except ImportError:
+    orjson = None
+
+# How long a cached 404 keeps a path from being re-requested (seconds)
+NEGATIVE_CACHE_TTL = 6 * 60 * 60
+
+# Checksum and metadata files that Reposilite serves alongside the artifacts themselves
+SECONDARY_ASSET_PATTERN = re.compile(r'(?:^|/)maven-metadata\.xml$|\.(?:md5|sha1|sha256|sha512)$')
+
+# Where interrupted asset discovery is checkpointed, and how often (in pages)
+STATE_FILE = '.nexus-sync-state.json'
+CHECKPOINT_INTERVAL = 10
+
+# Longest time buffered log lines wait before being flushed to the log file (seconds)
+LOG_FLUSH_INTERVAL = 2
+
+# Most recent asset paths remembered to drop repeats that show up on neighbouring pages
+DEDUP_WINDOW = 10000
+
+# Failures kept in memory for the summary; every failure is also written to the log file
+FAILED_SUMMARY_LIMIT = 20
+
+# Abort once Reposilite is clearly unusable: nearly all of the last results were server,
+# connection or authentication errors, or authentication was rejected several times in a row.
+# 404s are expected on a partial mirror and never count.
+CIRCUIT_WINDOW = 200
+CIRCUIT_MAX_ERRORS = 180
+CIRCUIT_AUTH_FAILURES = 5
+
+def parse_json(content):
+    """Decode a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -45,7 +92,9 @@ Examples:
     parser.add_argument('--nexus-password', '-p',
                        help='Nexus password (or set NEXUS_PASSWORD env var)')
     parser.add_argument('--rate-limit', '-r', type=int, default=5,
-                       help='Rate limit in requests per second (default: 5)')
+                       help='Rate limit in requests per second, applied to Reposilite and to Nexus separately (default: 5)')
+    parser.add_argument('--concurrency', '-c', type=int, default=8,
+                       help='Number of Reposilite requests kept in flight at once (default: 8)')
     parser.add_argument('--yes', '-y', action='store_true',
                        help='Skip confirmation prompt and start immediately')
     parser.add_argument('--quiet', '-q', action='store_true',
@@ -56,71 +105,251 @@ Examples:
                        help='List available repositories and exit (no sync performed)')
     parser.add_argument('--debug', action='store_true',
                        help='Enable detailed debug logging for troubleshooting')
+    parser.add_argument('--primary-only', action='store_true',
+                        help='Skip checksum (.md5/.sha1/.sha256/.sha512) and maven-metadata.xml paths')
+    parser.add_argument('--cache-db',
+                        help='SQLite file remembering Reposilite results between runs; paths already cached '
+                             'are skipped on reruns (default: disabled)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='With --cache-db, re-check previously cached paths with conditional requests '
+                             '(If-None-Match) instead of skipping them')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume Nexus asset discovery from the checkpoint of an interrupted run '
+                             '(combine with --cache-db to also skip finished requests)')
+    parser.add_argument('--trigger-method', choices=['head', 'get-range', 'get'], default='head',
+                        help='Request used to make Reposilite cache an artifact: head, get-range '
+                             '(GET of the first byte, for servers that only cache on GET) or get (default: head)')
+    parser.add_argument('--nexus-page-size', type=int,
+                        help='Assets per Nexus search page, sent as the limit parameter; servers that do not '
+                             'support it keep their own page size (default: server default)')
     parser.add_argument('--timeout', type=int, default=60,
                         help='Request timeout in seconds for Nexus API calls (default: 60)')
     
     args = parser.parse_args()
     
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.rate_limit < 1:
+        parser.error('--rate-limit must be at least 1')
+    if args.revalidate and not args.cache_db:
+        parser.error('--revalidate requires --cache-db')
+    if args.nexus_page_size is not None and not 1 <= args.nexus_page_size <= 10000:
+        parser.error('--nexus-page-size must be between 1 and 10000')
+    
     # Handle password from environment variable if not provided
     if args.nexus_username and not args.nexus_password:
         args.nexus_password = os.getenv('NEXUS_PASSWORD')
         if not args.nexus_password:
-            import getpass
             args.nexus_password = getpass.getpass('Nexus password: ')
     
     return args
 
+class TokenBucket:
+    """Thread-safe token bucket limiting the average request rate while allowing short bursts"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until it becomes available if the bucket is empty"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            # Going negative reserves a future token, so waiting callers queue up fairly
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        
+        # Sleep outside the lock so other threads can reserve their own slots
+        if delay > 0:
+            time.sleep(delay)
+
+class ResultCache:
+    """SQLite record of Reposilite responses so reruns can skip paths that are already settled"""
+    
+    COMMIT_INTERVAL = 500
+    
+    def __init__(self, db_path, target, negative_ttl=NEGATIVE_CACHE_TTL, revalidate=False):
+        self.target = target
+        self.negative_ttl = negative_ttl
+        self.revalidate = revalidate
+        self._uncommitted = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "target TEXT NOT NULL, path TEXT NOT NULL, status INTEGER NOT NULL, ts REAL NOT NULL, etag TEXT, "
+            "PRIMARY KEY (target, path))"
+        )
+        # Databases written before ETags were tracked lack the column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(seen)")}
+        if 'etag' not in columns:
+            self.conn.execute("ALTER TABLE seen ADD COLUMN etag TEXT")
+    
+    def lookup(self, path):
+        """Return (skip, etag): whether an earlier run settled the path, and the ETag it last saw"""
+        row = self.conn.execute(
+            "SELECT status, ts, etag FROM seen WHERE target = ? AND path = ?", (self.target, path)
+        ).fetchone()
+        if row is None:
+            return False, None
+        
+        status, ts, etag = row
+        if status == 200:
+            # When revalidating, cached paths are re-checked with a cheap conditional request instead
+            return not self.revalidate, etag
+        return status == 404 and time.time() - ts < self.negative_ttl, None
+    
+    def record(self, path, status, etag=None):
+        """Remember a deterministic outcome (200/206/304 or 404); transient failures are always retried"""
+        if status in (206, 304):
+            status = 200
+        if status not in (200, 404):
+            return
+        
+        self.conn.execute(
+            "INSERT INTO seen (target, path, status, ts, etag) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (target, path) DO UPDATE SET "
+            "status = excluded.status, ts = excluded.ts, etag = COALESCE(excluded.etag, seen.etag)",
+            (self.target, path, status, time.time(), etag)
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_INTERVAL:
+            self.commit()
+    
+    def commit(self):
+        self.conn.commit()
+        self._uncommitted = 0
+
 class NexusToReposiliteSyncer:
     def __init__(self, args):
         self.args = args
-        self.nexus_session = requests.Session()
+        self.nexus_session = self._create_session()
         if args.nexus_username and args.nexus_password:
             self.nexus_session.auth = (args.nexus_username, args.nexus_password)
+        # Fixed-width mask so the log doesn't reveal the password length
+        self._auth_display = f"{args.nexus_username}:{'********' if args.nexus_password else 'None'}"
         
-        self.reposilite_session = requests.Session()
+        self.reposilite_session = self._create_session()
+        self._reposilite_base_url = f"{args.reposilite_url}/{args.reposilite_repository}/"
         
         # Statistics
         self.total_artifacts = 0
         self.success_count = 0
         self.failed_count = 0
         self.failed_paths = []
+        self.skipped_count = 0
+        self._recent_errors = deque(maxlen=CIRCUIT_WINDOW)
+        self._auth_failure_streak = 0
         self.start_time = datetime.now()
         
+        # Dispatch bookkeeping, used to find a safe point to resume discovery from
+        self._pending = {}
+        self._dispatched = 0
+        # Lowest index of a path whose request failed in a way a rerun could fix (anything but 404)
+        self._first_unsettled = None
+        # (index of the page's first path, token that fetched the page, page number)
+        self._page_marks = deque()
+        self._discovery_complete = False
+        
+        # Shared state for worker threads
+        self._log_lock = threading.Lock()
+        self.rate_limiter = TokenBucket(args.rate_limit)
+        # Nexus page fetches get their own bucket so discovery never competes with Reposilite requests
+        self.nexus_rate_limiter = TokenBucket(args.rate_limit)
+        
         # Create log file
         if args.log_file:
             self.log_file = args.log_file
         else:
             self.log_file = f"nexus-sync-{datetime.now().strftime('%Y%m%d-%H%M%S')}.log"
         
+        # Opened on first use and kept open with a write buffer instead of reopening it per message
+        self._log_fh = None
+        # Timestamp string for the current second, reformatted only when the second changes
+        self._last_ts_sec = None
+        self._last_ts_str = None
+        self._last_flush = 0
+        
+        # Optional memory of earlier runs, only ever touched from the main thread. Opened by
+        # sync_all_artifacts, so modes that never sync (e.g. --list-repositories) don't create it
+        self.cache = None
+        
         self.debug_log("Syncer initialized in debug mode.")
         
-    def debug_log(self, message):
-        """Log a message only if debug mode is enabled."""
+    def _create_session(self):
+        """Create a session whose connection pool fits --concurrency and retries transient errors"""
+        session = requests.Session()
+        # Keep one pooled keep-alive connection per worker so requests don't pay a new handshake
+        pool_size = max(self.args.concurrency, 10)
+        # Retry connection errors and 429/502/503/504 up to 3 times with exponential backoff (retrying
+        # at once, then after 1 s and 2 s); when a 429/503 carries a Retry-After header, that wait is
+        # used instead. Read timeouts are not retried: the server may still be working on the request,
+        # and they should surface as requests.ReadTimeout after a single --timeout
+        retries = Retry(total=3, read=False, backoff_factor=0.5,
+                        status_forcelist=[429, 502, 503, 504],
+                        raise_on_status=False)
+        # Blocking makes extra threads wait for a pooled connection instead of opening throwaway ones
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True,
+                              max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+        
+    def debug_log(self, message, *args):
+        """Log a message only if debug mode is enabled; %-style args are formatted only then."""
         if self.args.debug:
+            if args:
+                message = message % args
             self.log(f"🔍 DEBUG: {message}", force=True)
             
     def log(self, message, force=False):
         """Log message to console and file"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_message = f"[{timestamp}] {message}"
-        
-        # Print to console unless in quiet mode (unless forced or it's an error/summary)
-        if not self.args.quiet or force or "ERROR" in message or "COMPLETED" in message or "STARTED" in message:
-            print(log_message)
-        
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_message + '\n')
+        self.log_lines([message], force=force)
+    
+    def log_lines(self, messages, force=False):
+        """Log several messages under one timestamp with a single console write and file write"""
+        # Serialize output so lines from worker threads don't interleave
+        with self._log_lock:
+            now = int(time.time())
+            if now != self._last_ts_sec:
+                self._last_ts_sec = now
+                self._last_ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+            log_messages = [f"[{self._last_ts_str}] {message}" for message in messages]
+            
+            # Print to console unless in quiet mode (unless forced or it's an error/summary)
+            console_messages = [
+                log_message for message, log_message in zip(messages, log_messages)
+                if not self.args.quiet or force or "ERROR" in message or "COMPLETED" in message or "STARTED" in message
+            ]
+            
+            if console_messages:
+                print('\n'.join(console_messages))
+            
+            if self._log_fh is None:
+                self._log_fh = open(self.log_file, 'a', encoding='utf-8', buffering=65536)
+                atexit.register(self._log_fh.close)
+            self._log_fh.write('\n'.join(log_messages) + '\n')
+            # Errors and failures reach the file right away; other lines at least every few seconds,
+            # so `tail -f` keeps up and a killed run loses little
+            if (now - self._last_flush >= LOG_FLUSH_INTERVAL
+                    or any("ERROR" in message or "FAILED" in message for message in messages)):
+                self._log_fh.flush()
+                self._last_flush = now
     
     def test_nexus_connectivity(self):
         """Test basic connectivity to Nexus before starting the sync"""
         self.log("Testing Nexus connectivity...")
         status_url = f"{self.args.nexus_url}/service/rest/v1/status"
-        self.debug_log(f"Connectivity test URL: {status_url}")
+        self.debug_log("Connectivity test URL: %s", status_url)
         
         try:
             # Try a simple status endpoint first
             response = self.nexus_session.get(status_url, timeout=self.args.timeout)
-            self.debug_log(f"Connectivity test response status: {response.status_code}")
+            self.debug_log("Connectivity test response status: %s", response.status_code)
             
             if response.status_code == 200:
                 self.log("✓ Nexus server is reachable")
@@ -157,18 +386,15 @@ class NexusToReposiliteSyncer:
         self.log("Fetching available repositories from Nexus...")
         
         url = f"{self.args.nexus_url}/service/rest/v1/repositories"
-        self.debug_log(f"Repository list URL: {url}")
+        self.debug_log("Repository list URL: %s", url)
         
         try:
             response = self.nexus_session.get(url, timeout=self.args.timeout)
-            self.debug_log(f"Repository list response status: {response.status_code}")
+            self.debug_log("Repository list response status: %s", response.status_code)
             
             if response.status_code == 200:
-                repositories = response.json()
-                self.debug_log(f"Found {len(repositories)} repositories in total.")
-                
-                self.log("Available repositories in Nexus:", force=True)
-                self.log("=" * 50, force=True)
+                repositories = parse_json(response.content)
+                self.debug_log("Found %d repositories in total.", len(repositories))
                 
                 maven_repos = []
                 other_repos = []
@@ -183,19 +409,25 @@ class NexusToReposiliteSyncer:
                     else:
                         other_repos.append((repo_name, repo_format, repo_type))
                 
+                # Collect the whole listing and emit it with one write instead of one per repository
+                separator = "=" * 50
+                lines = ["Available repositories in Nexus:", separator]
+                
                 if maven_repos:
-                    self.log("Maven2 repositories (compatible with this tool):", force=True)
-                    for name, repo_type in sorted(maven_repos):
-                        self.log(f"  {name} ({repo_type})", force=True)
+                    lines.append("Maven2 repositories (compatible with this tool):")
+                    lines.extend(f"  {name} ({repo_type})" for name, repo_type in sorted(maven_repos))
                 
                 if other_repos:
-                    self.log("\nOther repository formats:", force=True)
-                    for name, format_type, repo_type in sorted(other_repos):
-                        self.log(f"  {name} ({format_type}, {repo_type})", force=True)
+                    lines.append("\nOther repository formats:")
+                    lines.extend(f"  {name} ({format_type}, {repo_type})"
+                                 for name, format_type, repo_type in sorted(other_repos))
                 
-                self.log("=" * 50, force=True)
-                self.log(f"Total repositories: {len(repositories)}", force=True)
-                self.log(f"Maven2 repositories: {len(maven_repos)}", force=True)
+                lines += [
+                    separator,
+                    f"Total repositories: {len(repositories)}",
+                    f"Maven2 repositories: {len(maven_repos)}",
+                ]
+                self.log_lines(lines, force=True)
                 
                 return True
                 
@@ -220,62 +452,109 @@ class NexusToReposiliteSyncer:
             self.log(f"ERROR: Failed to list repositories: {e}", force=True)
             return False
 
-    def get_all_asset_paths_from_nexus(self):
-        """Get all asset paths from Nexus using the Search Assets API."""
-        self.log(f"Fetching all asset paths from Nexus repository: {self.args.nexus_repository}")
-        self.log(f"Nexus URL: {self.args.nexus_url}")
-        self.log(f"Authentication: {self.args.nexus_username}:{'*' * len(self.args.nexus_password) if self.args.nexus_password else 'None'}")
+    def iter_all_asset_paths_from_nexus(self):
+        """Yield all asset paths from Nexus page by page using the Search Assets API."""
+        self.log_lines([
+            f"Fetching all asset paths from Nexus repository: {self.args.nexus_repository}",
+            f"Nexus URL: {self.args.nexus_url}",
+            f"Authentication: {self._auth_display}",
+        ])
 
-        asset_paths = []
+        asset_count = 0
+        secondary_count = 0
+        duplicate_count = 0
+        # Nexus can repeat an asset on neighbouring pages while the repository changes. It pages in
+        # key order, so remembering only the most recent paths catches those repeats while keeping
+        # memory flat; a repeat further apart only costs one extra request
+        recent_paths = set()
+        recent_order = deque()
         continuation_token = None
         page = 1
+        
+        if self.args.resume:
+            checkpoint = self._load_crawl_checkpoint()
+            if checkpoint:
+                continuation_token = checkpoint['token']
+                page = checkpoint['page']
+                self.log(f"Resuming asset discovery at page {page} from {STATE_FILE}", force=True)
+            else:
+                self.log("No discovery checkpoint found - starting from the first page")
+        
+        page_marks = self._page_marks
+        yielded = 0
+        
+        # The query string only changes by its continuation token, so encode the rest once
+        query = {'repository': self.args.nexus_repository}
+        if self.args.nexus_page_size:
+            query['limit'] = self.args.nexus_page_size
+        search_url = f"{self.args.nexus_url}/service/rest/v1/search/assets?{urlencode(query)}"
+        
+        # Bound once here, since the loop below runs per page and per path
+        fetch_page = self.nexus_session.get
+        acquire_token = self.nexus_rate_limiter.acquire
+        timeout = self.args.timeout
+        primary_only = self.args.primary_only
+        is_secondary = SECONDARY_ASSET_PATTERN.search
+        remember_path = recent_paths.add
+        forget_path = recent_paths.discard
+        record_order = recent_order.append
 
         while True:
-            params = {
-                'repository': self.args.nexus_repository
-            }
-            if continuation_token:
-                params['continuationToken'] = continuation_token
-
-            url = f"{self.args.nexus_url}/service/rest/v1/search/assets"
+            if page % CHECKPOINT_INTERVAL == 0 and page_marks:
+                self._save_crawl_checkpoint()
+            
+            page_token = continuation_token
+            url = search_url
+            if page_token:
+                url = f"{search_url}&continuationToken={quote(page_token, safe='')}"
 
             try:
-                self.log(f"Fetching page {page} of assets...")
-                self.debug_log(f"Asset fetch URL: {url}")
-                self.debug_log(f"Asset fetch params: {params}")
+                # One regular log line per page (after the fetch); the rest is debug output
+                self.debug_log("Fetching page %d of assets: %s", page, url)
 
-                response = self.nexus_session.get(url, params=params, timeout=self.args.timeout)
+                acquire_token()
+                response = fetch_page(url, timeout=timeout)
 
-                self.debug_log(f"Asset fetch response status: {response.status_code}")
-                self.debug_log(f"Asset fetch response headers: {dict(response.headers)}")
+                self.debug_log("Asset fetch response status: %s", response.status_code)
+                self.debug_log("Asset fetch response headers: %s", response.headers)
                 
                 if response.status_code != 200:
                     self.log(f"ERROR: HTTP {response.status_code} - {response.reason}", force=True)
                     self.log(f"Response content: {response.text[:500]}...", force=True)
                     break
 
-                data = response.json()
-                self.debug_log(f"Response JSON keys: {list(data.keys())}")
-                self.debug_log(f"Continuation token from response: {data.get('continuationToken')}")
+                data = parse_json(response.content)
+                self.debug_log("Response JSON keys: %s", data.keys())
+                self.debug_log("Continuation token from response: %s", data.get('continuationToken'))
                 page_items = data.get('items', [])
                 
-                for asset in page_items:
-                    if asset.get('path'):
-                        asset_paths.append(asset['path'])
+                page_paths = [asset['path'] for asset in page_items if asset.get('path')]
+                if primary_only:
+                    primary_paths = [path for path in page_paths if not is_secondary(path)]
+                    secondary_count += len(page_paths) - len(primary_paths)
+                    page_paths = primary_paths
+                unique_paths = []
+                for path in page_paths:
+                    if path not in recent_paths:
+                        remember_path(path)
+                        record_order(path)
+                        unique_paths.append(path)
+                duplicate_count += len(page_paths) - len(unique_paths)
+                while len(recent_order) > DEDUP_WINDOW:
+                    forget_path(recent_order.popleft())
+                # Keep files of the same group/artifact next to each other for Reposilite's disk cache
+                unique_paths.sort()
+                page_paths = unique_paths
+                asset_count += len(page_paths)
 
-                self.log(f"Page {page}: Found {len(page_items)} assets (Total: {len(asset_paths)})")
+                self.log(f"Page {page}: Found {len(page_items)} assets (Total: {asset_count})")
 
                 if page_items:
-                    self.debug_log(f"Sample asset path from page: {page_items[0].get('path', 'N/A')}")
+                    self.debug_log("Sample asset path from page: %s", page_items[0].get('path', 'N/A'))
                 else:
                     self.debug_log("No assets found on this page.")
 
                 continuation_token = data.get('continuationToken')
-                if not continuation_token:
-                    break
-                
-                page += 1
-                time.sleep(0.2)
 
             except requests.exceptions.ConnectionError as e:
                 self.log("ERROR: Connection lost to Nexus server during asset fetch.", force=True)
@@ -292,37 +571,236 @@ class NexusToReposiliteSyncer:
                 self.log(f"Response content: {response.text[:500]}...", force=True)
                 break
 
-        self.log(f"Total asset paths found in Nexus: {len(asset_paths)}")
-        return asset_paths
+            page_marks.append((yielded, page_token, page))
+            
+            # Hand the page to the caller before fetching the next one, so requests start right away
+            yield from page_paths
+            yielded += len(page_paths)
+
+            if not continuation_token:
+                # The checkpoint is cleared once the requests for these paths have settled too
+                self._discovery_complete = True
+                break
+            
+            page += 1
+
+        totals = [f"Total asset paths found in Nexus: {asset_count}"]
+        if self.args.primary_only:
+            totals.append(f"Checksum/metadata paths skipped (--primary-only): {secondary_count}")
+        if duplicate_count:
+            totals.append(f"Duplicate asset paths skipped: {duplicate_count}")
+        self.log_lines(totals)
     
-    def request_artifact_in_reposilite(self, path):
-        """Request artifact in Reposilite to trigger caching"""
-        url = f"{self.args.reposilite_url}/{self.args.reposilite_repository}/{path}"
-        self.debug_log(f"Sending HEAD request to Reposilite: {url}")
+    def _crawl_state_key(self):
+        return f"{self.args.nexus_url}|{self.args.nexus_repository}"
+    
+    def _load_crawl_checkpoint(self):
+        """Return the saved discovery checkpoint for this repository, if any"""
+        try:
+            with open(STATE_FILE, encoding='utf-8') as f:
+                return json.load(f).get(self._crawl_state_key())
+        except (OSError, ValueError):
+            return None
+    
+    def _update_crawl_state(self, checkpoint):
+        """Store (or clear, when None) this repository's checkpoint, replacing the state file atomically"""
+        try:
+            with open(STATE_FILE, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        
+        if checkpoint is None:
+            if self._crawl_state_key() not in state:
+                return
+            del state[self._crawl_state_key()]
+        else:
+            state[self._crawl_state_key()] = checkpoint
         
         try:
-            # Use HEAD request to trigger caching without downloading full content
-            response = self.reposilite_session.head(url, timeout=self.args.timeout)
-            self.debug_log(f"Reposilite response status for '{path}': {response.status_code}")
+            if not state:
+                os.remove(STATE_FILE)
+                return
+            tmp_file = f"{STATE_FILE}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_file, STATE_FILE)
+        except OSError as e:
+            self.log(f"WARNING: Could not update {STATE_FILE}: {e}", force=True)
+    
+    def _save_crawl_checkpoint(self):
+        """Checkpoint the oldest page that still has unfinished or transiently failed requests,
+        so a rerun requests them again; returns the checkpointed page number"""
+        page_marks = self._page_marks
+        lowest_unfinished = min((index for index, _ in self._pending.values()), default=self._dispatched)
+        if self._first_unsettled is not None:
+            lowest_unfinished = min(lowest_unfinished, self._first_unsettled)
+        while len(page_marks) > 1 and page_marks[1][0] <= lowest_unfinished:
+            page_marks.popleft()
+        
+        _, token, page = page_marks[0]
+        self.debug_log("Checkpointing discovery at page %d", page)
+        self._update_crawl_state({'token': token, 'page': page})
+        return page
+    
+    def _finish_crawl_state(self, completed):
+        """Clear the checkpoint after a complete run with nothing left to retry, otherwise save it"""
+        if not self._page_marks:
+            return
+        if completed and self._discovery_complete and self._first_unsettled is None:
+            self._update_crawl_state(None)
+        else:
+            page = self._save_crawl_checkpoint()
+            self.log(f"Discovery checkpoint saved at page {page} - rerun with --resume to continue from there",
+                     force=True)
+    
+    def request_artifact_in_reposilite(self, path, etag=None):
+        """Request artifact in Reposilite to trigger caching, returning (success, message, HTTP status, ETag)"""
+        url = self._reposilite_base_url + path
+        method = self.args.trigger_method
+        self.debug_log("Sending %s request to Reposilite: %s", method, url)
+        
+        # A known ETag turns the request into a cheap 304 check when the artifact is still cached
+        headers = {'If-None-Match': etag} if etag else {}
+        
+        try:
+            if method == 'head':
+                # Use HEAD request to trigger caching without downloading full content
+                response = self.reposilite_session.head(url, headers=headers, timeout=self.args.timeout)
+            else:
+                if method == 'get-range':
+                    # Reposilite still fetches the whole artifact upstream, but only one byte comes back
+                    headers['Range'] = 'bytes=0-0'
+                with self.reposilite_session.get(url, headers=headers, stream=True,
+                                                 timeout=self.args.timeout) as response:
+                    # Drain the body in large chunks so the connection goes back to the pool
+                    for _ in response.iter_content(chunk_size=1 << 20):
+                        pass
+            self.debug_log("Reposilite response status for '%s': %s", path, response.status_code)
             
-            if response.status_code == 200:
-                return True, "Success"
-            elif response.status_code == 404:
-                return False, "Not found (may not exist in Nexus mirror)"
-            elif response.status_code == 401:
-                return False, "Authentication required"
-            elif response.status_code == 403:
-                return False, "Access forbidden"
+            status = response.status_code
+            if status in (200, 206):
+                success, message = True, "Success"
+            elif status == 304:
+                success, message = True, "Not modified (already cached)"
+            elif status == 404:
+                success, message = False, "Not found (may not exist in Nexus mirror)"
+            elif status == 401:
+                success, message = False, "Authentication required"
+            elif status == 403:
+                success, message = False, "Access forbidden"
             else:
-                return False, f"HTTP {response.status_code}"
+                success, message = False, f"HTTP {status}"
+            return success, message, status, response.headers.get('ETag')
                 
         except requests.Timeout:
-            return False, "Timeout"
+            return False, "Timeout", None, None
         except requests.RequestException as e:
-            return False, f"Request error: {str(e)}"
+            return False, f"Request error: {str(e)}", None, None
+    
+    def _request_artifact_rate_limited(self, path, etag=None):
+        """Worker entry point: wait for a rate limit token, then request the artifact"""
+        self.rate_limiter.acquire()
+        return self.request_artifact_in_reposilite(path, etag)
+    
+    def _record_result(self, index, path, success, message, status, etag):
+        """Update statistics and log the outcome of a single artifact request"""
+        if self.cache:
+            self.cache.record(path, status, etag)
+        
+        # Transient failures are never cached, so discovery checkpoints must not move past them
+        if not success and status != 404:
+            if self._first_unsettled is None or index < self._first_unsettled:
+                self._first_unsettled = index
+        
+        self.total_artifacts += 1
+        
+        # Successes only show up in debug mode and the progress line; every failure gets its own line
+        if success:
+            self.debug_log("[%d] ✓ SUCCESS: %s", self.total_artifacts, path)
+            self.success_count += 1
+        else:
+            self.log(f"[{self.total_artifacts}] ✗ FAILED: {path} ({message})")
+            self.failed_count += 1
+            if len(self.failed_paths) < FAILED_SUMMARY_LIMIT:
+                self.failed_paths.append((path, message))
+        
+        # No status means the request never got an answer (timeout or connection error)
+        self._recent_errors.append(status is None or status >= 500 or status in (401, 403))
+        self._auth_failure_streak = self._auth_failure_streak + 1 if status in (401, 403) else 0
+        
+        # Progress update every 50 artifacts
+        if self.total_artifacts % 50 == 0 and self.total_artifacts > 0:
+            elapsed = datetime.now() - self.start_time
+            if elapsed.total_seconds() > 0:
+                rate = self.total_artifacts / elapsed.total_seconds()
+                self.log(f"  Progress: {self.total_artifacts} artifacts processed, {rate:.2f} artifacts/sec")
+    
+    def _circuit_breaker_tripped(self):
+        """Return True (after logging why) once Reposilite is failing too consistently to continue"""
+        if self._auth_failure_streak >= CIRCUIT_AUTH_FAILURES:
+            reason = f"{self._auth_failure_streak} consecutive authentication failures (HTTP 401/403)"
+        elif len(self._recent_errors) == CIRCUIT_WINDOW and sum(self._recent_errors) >= CIRCUIT_MAX_ERRORS:
+            reason = (f"{sum(self._recent_errors)} of the last {CIRCUIT_WINDOW} requests failed with "
+                      f"server, connection or authentication errors")
+        else:
+            return False
+        self.log(f"ERROR: Stopping sync early - {reason}. Check the Reposilite URL, credentials and server health.", force=True)
+        return True
+    
+    def _process_asset_paths(self, asset_paths):
+        """Trigger caching for asset paths as they arrive, with up to --concurrency requests in flight.
+        
+        Returns False if the circuit breaker stopped the run early.
+        """
+        # Only keep a few batches queued so memory stays flat however large the repository is
+        max_pending = self.args.concurrency * 4
+        self.debug_log("Dispatching paths with concurrency %d (max %d pending)", self.args.concurrency, max_pending)
+        
+        executor = ThreadPoolExecutor(max_workers=self.args.concurrency)
+        pending = self._pending
+        completed = False
+        try:
+            # Results are handled on this thread only, so the counters need no locking
+            for index, path in enumerate(asset_paths):
+                self._dispatched = index + 1
+                etag = None
+                if self.cache:
+                    skip, etag = self.cache.lookup(path)
+                    if skip:
+                        self.debug_log("Skipping path settled by an earlier run: %s", path)
+                        self.skipped_count += 1
+                        continue
+                
+                pending[executor.submit(self._request_artifact_rate_limited, path, etag)] = (index, path)
+                
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        done_index, done_path = pending.pop(future)
+                        self._record_result(done_index, done_path, *future.result())
+                        # Checked per result so the thresholds hold exactly, not per batch
+                        if self._circuit_breaker_tripped():
+                            return False
+            
+            for future in as_completed(list(pending)):
+                done_index, done_path = pending.pop(future)
+                self._record_result(done_index, done_path, *future.result())
+                if self._circuit_breaker_tripped():
+                    return False
+            completed = True
+            return True
+        finally:
+            # Don't start queued requests if we are bailing out (e.g. Ctrl+C)
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.cache:
+                self.cache.commit()
+            self._finish_crawl_state(completed)
     
     def sync_all_artifacts(self):
         """Main synchronization process"""
+        # Measure from the actual start, not from when the syncer was created
+        self.start_time = datetime.now()
         self.log("=" * 80, force=True)
         self.log("NEXUS TO REPOSILITE FULL EXPORT STARTED", force=True)
         self.log("=" * 80, force=True)
@@ -335,11 +813,23 @@ class NexusToReposiliteSyncer:
             self.log("ERROR: Cannot establish connection to Nexus - aborting sync", force=True)
             return False
         
-        # Step 1: Get all asset paths from Nexus
-        asset_paths = self.get_all_asset_paths_from_nexus()
-        self.debug_log(f"Total asset paths retrieved from Nexus: {len(asset_paths)}")
+        if self.args.cache_db:
+            self.cache = ResultCache(self.args.cache_db,
+                                     f"{self.args.reposilite_url}/{self.args.reposilite_repository}",
+                                     revalidate=self.args.revalidate)
         
-        if not asset_paths:
+        # Step 1: Stream asset paths from Nexus straight into Reposilite requests
+        self.log("\n" + "=" * 80, force=True)
+        self.log("STARTING ARTIFACT SYNCHRONIZATION", force=True)
+        self.log("=" * 80, force=True)
+        
+        completed = self._process_asset_paths(self.iter_all_asset_paths_from_nexus())
+        self.debug_log("Total asset paths processed: %d", self.total_artifacts)
+        if not completed:
+            self.print_summary()
+            return False
+        
+        if self.total_artifacts == 0 and self.skipped_count == 0:
             self.log("ERROR: No asset paths found or failed to fetch from Nexus", force=True)
             self.log("TROUBLESHOOTING:", force=True)
             self.log("1. Check if the repository name is correct with --list-repositories", force=True)
@@ -347,38 +837,6 @@ class NexusToReposiliteSyncer:
             self.log("3. The repository might actually be empty.", force=True)
             return False
         
-        # Step 2: Process each artifact path
-        self.log("\n" + "=" * 80, force=True)
-        self.log("STARTING ARTIFACT SYNCHRONIZATION", force=True)
-        self.log("=" * 80, force=True)
-        
-        total_paths = len(asset_paths)
-        for i, path in enumerate(asset_paths, 1):
-            self.debug_log(f"Processing path {i}/{total_paths}: {path}")
-            self.log(f"\n[{i}/{total_paths}] Requesting: {path}")
-            
-            success, message = self.request_artifact_in_reposilite(path)
-            
-            if success:
-                self.log(f"  ✓ SUCCESS: {path}")
-                self.success_count += 1
-            else:
-                self.log(f"  ✗ FAILED: {path} ({message})")
-                self.failed_count += 1
-                self.failed_paths.append((path, message))
-            
-            self.total_artifacts += 1
-            
-            # Rate limiting
-            time.sleep(1.0 / self.args.rate_limit)
-            
-            # Progress update every 50 artifacts
-            if self.total_artifacts % 50 == 0 and self.total_artifacts > 0:
-                elapsed = datetime.now() - self.start_time
-                if elapsed.total_seconds() > 0:
-                    rate = self.total_artifacts / elapsed.total_seconds()
-                    self.log(f"  Progress: {self.total_artifacts} artifacts processed, {rate:.2f} artifacts/sec")
-        
         # Final summary
         self.print_summary()
         return True
@@ -387,81 +845,93 @@ class NexusToReposiliteSyncer:
         """Print final synchronization summary"""
         elapsed = datetime.now() - self.start_time
         rate = self.total_artifacts / elapsed.total_seconds() if elapsed.total_seconds() > 0 else 0
+        success_rate = f"{self.success_count / self.total_artifacts * 100:.1f}%" if self.total_artifacts > 0 else "N/A"
         
-        self.log("\n" + "=" * 80, force=True)
-        self.log("SYNCHRONIZATION COMPLETED", force=True)
-        self.log("=" * 80, force=True)
-        self.log(f"Total artifacts processed: {self.total_artifacts}", force=True)
-        self.log(f"Successfully cached: {self.success_count}", force=True)
-        self.log(f"Failed: {self.failed_count}", force=True)
+        lines = [
+            "\n" + "=" * 80,
+            "SYNCHRONIZATION COMPLETED",
+            "=" * 80,
+            f"Total artifacts processed: {self.total_artifacts}",
+            f"Successfully cached: {self.success_count}",
+            f"Failed: {self.failed_count}",
+        ]
+        if self.cache:
+            lines.append(f"Skipped (settled by earlier runs): {self.skipped_count}")
         
         if self.failed_paths:
-            self.log("--- FAILED ARTIFACTS ---", force=True)
+            lines.append("--- FAILED ARTIFACTS ---")
             # Limit printing to avoid flooding console, full list is in log
-            for i, (path, reason) in enumerate(self.failed_paths):
-                if i < 20: # Show first 20 failures in summary
-                    self.log(f"  - {path} (Reason: {reason})", force=True)
-            if len(self.failed_paths) > 20:
-                self.log(f"  ... and {len(self.failed_paths) - 20} more. See log file for full list.", force=True)
-            self.log("------------------------", force=True)
-
-        self.log(f"Success rate: {(self.success_count/self.total_artifacts*100):.1f}%" if self.total_artifacts > 0 else "N/A", force=True)
-        self.log(f"Total time: {str(elapsed).split('.')[0]}", force=True)
-        self.log(f"Average rate: {rate:.2f} artifacts/second", force=True)
-        self.log(f"Log file: {self.log_file}", force=True)
-        self.log("=" * 80, force=True)
+            lines.extend(f"  - {path} (Reason: {reason})" for path, reason in self.failed_paths)
+            if self.failed_count > len(self.failed_paths):
+                lines.append(f"  ... and {self.failed_count - len(self.failed_paths)} more. See log file for full list.")
+            lines.append("------------------------")
+        
+        lines += [
+            f"Success rate: {success_rate}",
+            f"Total time: {str(elapsed).split('.')[0]}",
+            f"Average rate: {rate:.2f} artifacts/second",
+            f"Log file: {self.log_file}",
+            "=" * 80,
+        ]
+        self.log_lines(lines, force=True)
+        self.flush_log()
+    
+    def flush_log(self):
+        """Push buffered log lines to disk"""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.flush()
 
 def main():
     args = parse_arguments()
     
     # Handle repository listing mode
     if args.list_repositories:
-        print("Nexus Repository Discovery Tool")
-        print("=" * 50)
-        print(f"Nexus URL: {args.nexus_url}")
+        banner = ["Nexus Repository Discovery Tool", "=" * 50, f"Nexus URL: {args.nexus_url}"]
         if args.nexus_username:
-            print(f"Authentication: {args.nexus_username}")
-        print()
+            banner.append(f"Authentication: {args.nexus_username}")
+        sys.stdout.write("\n".join(banner) + "\n\n")
         
-        # Create syncer just for repository listing
-        syncer = NexusToReposiliteSyncer(args)
-        success = syncer.list_nexus_repositories()
+        success = NexusToReposiliteSyncer(args).list_nexus_repositories()
         
         if success:
-            print("\nTo sync artifacts from a specific repository, use:")
-            print(f"python3 {sys.argv[0]} --nexus-repository <repository-name>")
+            print(f"\nTo sync artifacts from a specific repository, use:\n"
+                  f"python3 {sys.argv[0]} --nexus-repository <repository-name>")
         
         sys.exit(0 if success else 1)
     
-    print("Nexus to Reposilite Full Export Tool")
-    print("=" * 50)
-    
-    # Display configuration
-    print(f"Source: {args.nexus_url}/repository/{args.nexus_repository}")
-    print(f"Target: {args.reposilite_url}/{args.reposilite_repository}")
-    print(f"Rate limit: {args.rate_limit} requests/second")
-    print(f"Timeout: {args.timeout} seconds")
+    # Display configuration and helpful hints in one write
+    banner = [
+        "Nexus to Reposilite Full Export Tool",
+        "=" * 50,
+        f"Source: {args.nexus_url}/repository/{args.nexus_repository}",
+        f"Target: {args.reposilite_url}/{args.reposilite_repository}",
+        f"Rate limit: {args.rate_limit} requests/second",
+        f"Concurrency: {args.concurrency} requests in flight",
+        f"Timeout: {args.timeout} seconds",
+    ]
     if args.nexus_username:
-        print(f"Nexus authentication: {args.nexus_username}")
-    print()
-    
-    # Show helpful hints
-    print("💡 TIP: Use --list-repositories to see available repositories first")
+        banner.append(f"Nexus authentication: {args.nexus_username}")
+    banner += ["", "💡 TIP: Use --list-repositories to see available repositories first"]
     if args.debug:
-        print("🔍 DEBUG MODE: Verbose logging is active.")
-    print()
+        banner.append("🔍 DEBUG MODE: Verbose logging is active.")
+    sys.stdout.write("\n".join(banner) + "\n\n")
     
-    # Confirm before starting (unless --yes flag is used)
-    if not args.yes:
+    # Confirm before starting (unless --yes flag is used or nobody is at a terminal to answer)
+    if not args.yes and sys.stdin.isatty():
         response = input("Do you want to start the full export? This may take a long time! (y/N): ")
         if response.lower() != 'y':
-            print("Export cancelled.")
-            print("\nTo discover available repositories, run:")
-            print(f"python3 {sys.argv[0]} --list-repositories")
+            print(f"Export cancelled.\n"
+                  f"\nTo discover available repositories, run:\n"
+                  f"python3 {sys.argv[0]} --list-repositories")
             sys.exit(0)
+    elif not args.yes:
+        print("stdin is not a terminal - starting without confirmation")
     
-    # Start synchronization
+    # Created only once the run is confirmed, so a cancelled run leaves no cache DB or log file behind
     syncer = NexusToReposiliteSyncer(args)
+    
+    # Start synchronization
     try:
         success = syncer.sync_all_artifacts()
         sys.exit(0 if success else 1)